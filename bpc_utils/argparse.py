@@ -3,7 +3,7 @@
 from .typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from .typing import Dict, Final, Linesep, Optional, Union
+    from .typing import Dict, Final, Linesep, Optional, T, Union
 
 
 def parse_positive_integer(s: 'Optional[Union[str, int]]') -> 'Optional[int]':
@@ -33,6 +33,22 @@ def parse_positive_integer(s: 'Optional[Union[str, int]]') -> 'Optional[int]':
     return value
 
 
+def _add_case_variants(lookup: 'Dict[str, T]') -> 'Dict[str, T]':
+    """Extend a lookup mapping with the upper case and title case variants of its (lower case) keys.
+
+    Args:
+        lookup: the lookup mapping with lower case keys
+
+    Returns:
+        the extended lookup mapping
+
+    """
+    extended = {}  # type: Dict[str, T]
+    for key, value in lookup.items():
+        extended[key] = extended[key.upper()] = extended[key.title()] = value
+    return extended
+
+
 _boolean_state_lookup = {
     '1': True,
     'yes': True,
@@ -45,6 +61,7 @@ _boolean_state_lookup = {
     'false': False,
     'off': False,
 }  # type: Final[Dict[str, bool]]
+_boolean_state_cased_lookup = _add_case_variants(_boolean_state_lookup)  # type: Final[Dict[str, bool]]
 
 
 def parse_boolean_state(s: 'Optional[str]') -> 'Optional[bool]':
@@ -70,6 +87,8 @@ def parse_boolean_state(s: 'Optional[str]') -> 'Optional[bool]':
     """
     if s is None:
         return None
+    if s in _boolean_state_cased_lookup:
+        return _boolean_state_cased_lookup[s]
     try:
         return _boolean_state_lookup[s.lower()]
     except KeyError:
@@ -84,6 +103,7 @@ _linesep_lookup = {
     '\r': '\r',
     'cr': '\r',
 }  # type: Final[Dict[str, Linesep]]
+_linesep_cased_lookup = _add_case_variants(_linesep_lookup)  # type: Final[Dict[str, Linesep]]
 
 
 def parse_linesep(s: 'Optional[str]') -> 'Optional[Linesep]':
@@ -111,12 +131,22 @@ def parse_linesep(s: 'Optional[str]') -> 'Optional[Linesep]':
     """
     if not s:
         return None
+    if s in _linesep_cased_lookup:
+        return _linesep_cased_lookup[s]
     try:
         return _linesep_lookup[s.lower()]
     except KeyError:
         raise ValueError('invalid linesep value {!r}'.format(s)) from None
 
 
+_tab_indentation_lookup = {
+    't': '\t',
+    'tab': '\t',
+    '\t': '\t',
+}  # type: Final[Dict[str, str]]
+_tab_indentation_cased_lookup = _add_case_variants(_tab_indentation_lookup)  # type: Final[Dict[str, str]]
+
+
 def parse_indentation(s: 'Optional[Union[str, int]]') -> 'Optional[str]':
     r"""Parse indentation from a string representation.
 
@@ -143,10 +173,12 @@ def parse_indentation(s: 'Optional[Union[str, int]]') -> 'Optional[str]':
     if not isinstance(s, (str, int)):
         raise TypeError('expect str or int, got {!r}'.format(s))
     if isinstance(s, str):
-        if s.lower() in {'t', 'tab', '\t'}:
+        if s in _tab_indentation_cased_lookup:
             return '\t'
-        if s == ' ' * len(s):
+        if s.count(' ') == len(s):
             return s
+        if s.lower() in _tab_indentation_lookup:
+            return '\t'
     try:
         n = int(s)
         if n <= 0:
@@ -10,7 +10,7 @@ from .typing import TYPE_CHECKING, TypeVar, final
 
 if TYPE_CHECKING:
     from .misc import Config
-    from .typing import Callable, Final, Linesep, Optional, Tuple
+    from .typing import Dict, Final, Linesep, List, Optional, Tuple, Type
 
 BaseContextType = TypeVar('BaseContextType', bound='BaseContext')
 
@@ -18,6 +18,9 @@ BaseContextType = TypeVar('BaseContextType', bound='BaseContext')
 class BaseContext(abc.ABC):
     """Abstract base class for general conversion context."""
 
+    #: Names of the processing methods of each context class, see :meth:`~bpc_utils.BaseContext._get_process_table`.
+    _method_tables = {}  # type: Dict[Type[BaseContext], Dict[str, str]]
+
     def __init__(self, node: 'parso.tree.NodeOrLeaf', config: 'Config', *,
                  indent_level: int = 0, raw: bool = False) -> None:
         """Initialize BaseContext.
@@ -46,10 +49,10 @@ class BaseContext(abc.ABC):
         #: UUID generator.
         self._uuid_gen = UUID4Generator(dash=False)  # type: Final[UUID4Generator]
 
-        #: Code before insertion point.
-        self._prefix = ''  # type: str
-        #: Code after insertion point.
-        self._suffix = ''  # type: str
+        #: Pieces of code before insertion point, see :attr:`self._prefix <bpc_utils.BaseContext._prefix>`.
+        self._prefix_parts = []  # type: List[str]
+        #: Pieces of code after insertion point, see :attr:`self._suffix <bpc_utils.BaseContext._suffix>`.
+        self._suffix_parts = []  # type: List[str]
         #: Final converted result.
         self._buffer = ''  # type: str
 
@@ -58,6 +61,9 @@ class BaseContext(abc.ABC):
         #: Preceding node with the target expression, i.e. the *insertion point*.
         self._node_before_expr = None  # type: Optional[parso.tree.NodeOrLeaf]
 
+        #: Names of the processing methods for specific node types.
+        self._process_table = self._get_process_table()  # type: Final[Dict[str, str]]
+
         self._walk(node)  # traverse children
 
         if raw:
@@ -81,11 +87,55 @@ class BaseContext(abc.ABC):
 
         """
         if self._prefix_or_suffix:
-            self._prefix += code
+            self._prefix_parts.append(code)
         else:
-            self._suffix += code
+            self._suffix_parts.append(code)
         return self
 
+    @property
+    def _prefix(self) -> str:
+        """Code before insertion point.
+
+        Code is collected as a list of pieces (:attr:`self._prefix_parts <bpc_utils.BaseContext._prefix_parts>`)
+        and only joined when read, to avoid quadratic string concatenation.
+
+        """
+        return self._join_parts(self._prefix_parts)
+
+    @_prefix.setter
+    def _prefix(self, code: str) -> None:
+        self._prefix_parts = [code]
+
+    @property
+    def _suffix(self) -> str:
+        """Code after insertion point.
+
+        Code is collected as a list of pieces (:attr:`self._suffix_parts <bpc_utils.BaseContext._suffix_parts>`)
+        and only joined when read, to avoid quadratic string concatenation.
+
+        """
+        return self._join_parts(self._suffix_parts)
+
+    @_suffix.setter
+    def _suffix(self, code: str) -> None:
+        self._suffix_parts = [code]
+
+    @final
+    @staticmethod
+    def _join_parts(parts: 'List[str]') -> str:
+        """Join pieces of code in place.
+
+        Args:
+            parts: pieces of code, replaced by the joined code if there are more than one
+
+        Returns:
+            the joined code
+
+        """
+        if len(parts) > 1:
+            parts[:] = [''.join(parts)]
+        return parts[0] if parts else ''
+
     @final
     def __str__(self) -> str:
         """Returns a *stripped* version of :attr:`self._buffer <bpc_utils.BaseContext._buffer>`."""
@@ -140,10 +190,9 @@ class BaseContext(abc.ABC):
             node: parso AST
 
         """
-        func_name = '_process_%s' % node.type
-        if hasattr(self, func_name):
-            func = getattr(self, func_name)  # type: Callable[[parso.tree.NodeOrLeaf], None]
-            func(node)
+        name = self._process_table.get(node.type)
+        if name is not None:
+            getattr(self, name)(node)
             return
 
         # process node
@@ -155,6 +204,26 @@ class BaseContext(abc.ABC):
         # preserve leaf node as is by default
         self += node.get_code()
 
+    @final
+    @classmethod
+    def _get_process_table(cls) -> 'Dict[str, str]':
+        """Get the names of the processing methods of the class, keyed by node type.
+
+        The mapping is built from the ``_process_{type}`` methods of the class on first use,
+        and then cached in :attr:`BaseContext._method_tables <bpc_utils.BaseContext._method_tables>`.
+
+        Returns:
+            a mapping from node types to names of processing methods
+
+        """
+        table = BaseContext._method_tables.get(cls)
+        if table is None:
+            prefix = '_process_'
+            table = BaseContext._method_tables[cls] = {
+                name[len(prefix):]: name for name in dir(cls) if name.startswith(prefix)
+            }
+        return table
+
     @abc.abstractmethod
     def _concat(self) -> None:
         """Concatenate final string."""
@@ -192,24 +261,13 @@ class BaseContext(abc.ABC):
             a tuple of *prefix comments* and *suffix code*
 
         """
-        prefix = ''
-        suffix = ''
-        prefix_or_suffix = True
-
+        # find the offset of the first line which is not a comment, then split the code there
+        offset = 0
         for line in code.split(linesep):
-            if prefix_or_suffix:
-                if line.strip().startswith('#'):
-                    prefix += line + linesep
-                    continue
-                prefix_or_suffix = False
-            suffix += line + linesep
-
-        if prefix_or_suffix:
-            prefix = prefix[:-len(linesep)]  # 3.9+ str.removesuffix
-        else:
-            suffix = suffix[:-len(linesep)]
-
-        return prefix, suffix
+            if not line.lstrip().startswith('#'):
+                return code[:offset], code[offset:]
+            offset += len(line) + len(linesep)
+        return code, ''
 
     @final
     @staticmethod
@@ -228,21 +286,19 @@ class BaseContext(abc.ABC):
         """
         current = 0
 
-        # count trailing newlines in `prefix`
+        # count trailing newlines in `prefix`, i.e. line separators in its trailing whitespaces
+        # (plus the first line if `prefix` consists only of whitespaces)
         if prefix:
-            for line in reversed(prefix.split(linesep)):  # pragma: no branch
-                if line.strip():
-                    break
-                current += 1
+            stripped = prefix.rstrip()
+            current += prefix.count(linesep, len(stripped)) + (0 if stripped else 1)
             if current > 0:  # keep a trailing newline in `prefix`
                 current -= 1
 
-        # count leading newlines in `suffix`
+        # count leading newlines in `suffix`, i.e. line separators in its leading whitespaces
+        # (plus the last line if `suffix` consists only of whitespaces)
         if suffix:
-            for line in suffix.split(linesep):  # pragma: no branch
-                if line.strip():
-                    break
-                current += 1
+            stripped = suffix.lstrip()
+            current += suffix.count(linesep, 0, len(suffix) - len(stripped)) + (0 if stripped else 1)
 
         missing = expected - current
         return max(missing, 0)
@@ -260,20 +316,12 @@ class BaseContext(abc.ABC):
 
         """
         # get preceding whitespaces
-        prefix = ''
-        for char in code:
-            if char not in ' \t\n\r\f':
-                break
-            prefix += char
+        prefix = code[:len(code) - len(code.lstrip(' \t\n\r\f'))]
 
         # get succeeding whitespaces
-        suffix = ''
-        for char in reversed(code):
-            if char not in ' \t\n\r\f':
-                break
-            suffix += char
+        suffix = code[len(code.rstrip(' \t\n\r\f')):]
 
-        return prefix, suffix[::-1]
+        return prefix, suffix
 
     @final
     @staticmethod
@@ -1,23 +1,24 @@
 """File processing routines for BPC."""
 
 import binascii
-import collections
-import contextlib
+import concurrent.futures
 import glob
 import itertools
 import json
 import os
 import shutil
+import stat
 import sys
 import tarfile
 import tempfile
 import time
 
-from .misc import UUID4Generator, is_windows
+from .misc import UUID4Generator, is_windows, nullcontext
+from .multiprocessing import CPU_CNT, mp, parallel_available
 from .typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from .typing import Deque, Dict, Final, Iterable, Iterator, List, Set, Tuple
+    from .typing import Dict, Final, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 # gzip support detection
 try:
@@ -31,38 +32,159 @@ except (ImportError, AttributeError):  # pragma: no cover
 else:
     has_gz_support = True
 
+# orjson support detection
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    has_orjson_support = False
+else:  # pragma: no cover
+    has_orjson_support = True
+
 #: Final[str]: File name for the lookup table in the archive file.
 LOOKUP_TABLE = '_lookup_table.json'  # type: Final[str]
 
+#: Final[Tuple[str, ...]]: File name suffixes of Python source files.
+_PY_SUFFIXES = ('.py', '.pyw')  # type: Final[Tuple[str, ...]]
+
+#: Final[bytes]: Magic number at the start of *gzip* files.
+_GZIP_MAGIC = b'\x1f\x8b'  # type: Final[bytes]
+
+#: Final[int]: Buffer size for reading and writing archive data.
+_BUFFER_SIZE = 1 << 20  # type: Final[int]
+
+#: int: Minimum number of directories on a level of the directory tree before scanning them concurrently.
+_PARALLEL_SCAN_THRESHOLD = 4  # type: int
+
+#: int: Minimum number of files to archive before compressing them in parallel.
+_PARALLEL_ARCHIVE_THRESHOLD = 64  # type: int
+
+
+if is_windows:  # pragma: no cover
+    def is_python_filename(filename: str) -> bool:
+        """Determine whether a file is a Python source file by its extension.
+
+        Args:
+            filename: the name of the file
+
+        Returns:
+            whether the file is a Python source file
+
+        """
+        return filename.lower().endswith(_PY_SUFFIXES)
+else:  # pragma: no cover
+    def is_python_filename(filename: str) -> bool:
+        """Determine whether a file is a Python source file by its extension.
+
+        Args:
+            filename: the name of the file
+
+        Returns:
+            whether the file is a Python source file
 
-def is_python_filename(filename: str) -> bool:
-    """Determine whether a file is a Python source file by its extension.
+        """
+        return filename.endswith(_PY_SUFFIXES)
+
+
+if sys.version_info[:2] >= (3, 5):  # pragma: no cover
+    def expand_glob_iter(pattern: str) -> 'Iterator[str]':
+        """Wrapper function to perform glob expansion.
+
+        Args:
+            pattern: the pattern to expand
+
+        Returns:
+            an iterator of expansion result
+
+        """
+        return glob.iglob(pattern, recursive=True)  # novermin
+else:  # pragma: no cover
+    def expand_glob_iter(pattern: str) -> 'Iterator[str]':
+        """Wrapper function to perform glob expansion.
+
+        Args:
+            pattern: the pattern to expand
+
+        Returns:
+            an iterator of expansion result
+
+        """
+        return glob.iglob(pattern)
+
+
+class _DirEntry:  # pragma: no cover
+    """Minimal substitute of :class:`os.DirEntry` for Python < 3.5.
 
     Args:
-        filename: the name of the file
+        directory: the directory containing the entry
+        name: the name of the entry
+
+    """
+
+    def __init__(self, directory: str, name: str) -> None:
+        self.name = name
+        self.path = os.path.join(directory, name)
+
+    def is_symlink(self) -> bool:
+        return os.path.islink(self.path)
+
+    def is_file(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def is_dir(self) -> bool:
+        return os.path.isdir(self.path)
+
+
+def _scandir(directory: str) -> 'List[Union[os.DirEntry[str], _DirEntry]]':
+    """Wrapper function to list the entries of a directory with cached file type information.
+
+    Args:
+        directory: the directory to list
 
     Returns:
-        whether the file is a Python source file
+        a list of entries of the directory
 
     """
-    if is_windows:  # pragma: no cover
-        filename = filename.lower()
-    return os.path.splitext(filename)[1] in {'.py', '.pyw'}
+    if hasattr(os, 'scandir'):  # pragma: no branch
+        # exhaust the iterator so that the directory is closed right away (it is a context manager only since 3.6)
+        return list(os.scandir(directory))  # novermin
+    return [_DirEntry(directory, name) for name in os.listdir(directory)]  # pragma: no cover
 
 
-def expand_glob_iter(pattern: str) -> 'Iterator[str]':
-    """Wrapper function to perform glob expansion.
+def _scan_directory(directory: str) -> 'Tuple[List[Tuple[Tuple[int, int], str]], List[str]]':
+    """Find Python files and subdirectories in a directory.
 
     Args:
-        pattern: the pattern to expand
+        directory: the directory to scan (should be a *real path*)
 
     Returns:
-        an iterator of expansion result
+        a tuple of the Python files found (as *real paths* keyed by inode)
+        and the subdirectories found (as *real paths*)
 
     """
-    if sys.version_info[:2] < (3, 5):  # pragma: no branch
-        return glob.iglob(pattern)  # pragma: no cover
-    return glob.iglob(pattern, recursive=True)  # pragma: no cover  # novermin
+    found_files = []  # type: List[Tuple[Tuple[int, int], str]]
+    found_directories = []  # type: List[str]
+    for entry in _scandir(directory):
+        if entry.is_symlink():
+            item_realpath = os.path.realpath(entry.path)
+            try:
+                item_stat = os.stat(item_realpath)
+            except (OSError, ValueError):  # broken symlink, same as os.path.isfile and os.path.isdir
+                continue
+            if stat.S_ISREG(item_stat.st_mode):
+                if is_python_filename(entry.path) or is_python_filename(item_realpath):
+                    found_files.append(((item_stat.st_ino, item_stat.st_dev), item_realpath))
+            elif stat.S_ISDIR(item_stat.st_mode):
+                found_directories.append(item_realpath)
+        # ``directory`` is a real path, so is the path of a non-symlink entry
+        elif entry.is_file():
+            if is_python_filename(entry.path):
+                # key by a real stat like the top-level files in detect_files, as the inode from the
+                # directory listing and the device of the directory may differ (e.g. for bind mounts)
+                item_stat = os.stat(entry.path)
+                found_files.append(((item_stat.st_ino, item_stat.st_dev), entry.path))
+        elif entry.is_dir():
+            found_directories.append(entry.path)
+    return found_files, found_directories
 
 
 def detect_files(files: 'Iterable[str]') -> 'List[str]':
@@ -81,44 +203,151 @@ def detect_files(files: 'Iterable[str]') -> 'List[str]':
         See :func:`~bpc_utils.fileprocessing.expand_glob_iter` for more information.
 
     """
-    file_list = []  # type: List[str]
-    directory_queue = collections.deque()  # type: Deque[str]
+    # files are keyed by inode to remove duplicates (including hard links pointing to the same file)
+    file_dict = {}  # type: Dict[Tuple[int, int], str]
+    directory_queue = []  # type: List[str]
     directory_visited = set()  # type: Set[str]
 
-    # perform glob expansion on windows
+    # perform glob expansion on windows (paths without wildcards are checked below anyway)
     if is_windows:  # pragma: no cover
-        files = itertools.chain.from_iterable(map(expand_glob_iter, files))
+        files = itertools.chain.from_iterable(expand_glob_iter(file) if glob.has_magic(file) else (file,)
+                                              for file in files)
 
     # find top-level files and directories
     for file in files:
         file = os.path.realpath(file)
-        if os.path.isfile(file):  # user specified files should be added even without .py extension
-            file_list.append(file)
-        elif os.path.isdir(file):
-            directory_queue.appendleft(file)
+        try:
+            file_stat = os.stat(file)
+        except (OSError, ValueError):  # same as os.path.isfile and os.path.isdir
+            continue
+        if stat.S_ISREG(file_stat.st_mode):  # user specified files should be added even without .py extension
+            file_dict[(file_stat.st_ino, file_stat.st_dev)] = file
+        elif stat.S_ISDIR(file_stat.st_mode):
+            directory_queue.append(file)
             directory_visited.add(file)
 
-    # find files in subdirectories
-    while directory_queue:
-        directory = directory_queue.pop()
-        for item in os.listdir(directory):
-            item_path = os.path.join(directory, item)
-            item_realpath = os.path.realpath(item_path)
-            if os.path.isfile(item_realpath) and (is_python_filename(item_path) or is_python_filename(item_realpath)):
-                file_list.append(item_realpath)
-            elif os.path.isdir(item_realpath):
-                if item_realpath not in directory_visited:  # avoid symlink directory loops
-                    directory_queue.appendleft(item_realpath)
-                    directory_visited.add(item_realpath)
-
-    # remove duplicates (including hard links pointing to the same file)
-    file_dict = {}  # type: Dict[Tuple[int, int], str]
-    for file in file_list:
-        file_stat = os.stat(file)
-        file_dict[(file_stat.st_ino, file_stat.st_dev)] = file
+    # find files in subdirectories level by level, scanning directories of large levels concurrently;
+    # results are merged in order so that the outcome is the same as a sequential breadth-first search
+    executor = None  # type: Optional[concurrent.futures.ThreadPoolExecutor]
+    try:
+        while directory_queue:
+            if len(directory_queue) < _PARALLEL_SCAN_THRESHOLD:
+                results = [_scan_directory(directory) for directory in directory_queue]
+            else:
+                if executor is None:
+                    executor = concurrent.futures.ThreadPoolExecutor(max_workers=min(32, CPU_CNT * 4))
+                results = list(executor.map(_scan_directory, directory_queue))
+            directory_queue = []
+            for found_files, found_directories in results:
+                file_dict.update(found_files)
+                for item_realpath in found_directories:
+                    if item_realpath not in directory_visited:  # avoid symlink directory loops
+                        directory_queue.append(item_realpath)
+                        directory_visited.add(item_realpath)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
     return list(file_dict.values())
 
 
+def _make_tarinfo(arcname: str, file_stat: 'os.stat_result') -> tarfile.TarInfo:
+    """Build the *tar* header of a regular file from its stat result.
+
+    Unlike :meth:`tarfile.TarFile.gettarinfo`, this does not stat the file again
+    nor look up user and group names.
+
+    Args:
+        arcname: the name of the file in the archive
+        file_stat: the stat result of the file
+
+    Returns:
+        the *tar* header of the file
+
+    """
+    tarinfo = tarfile.TarInfo(arcname)
+    tarinfo.mode = stat.S_IMODE(file_stat.st_mode)
+    tarinfo.uid = file_stat.st_uid
+    tarinfo.gid = file_stat.st_gid
+    tarinfo.size = file_stat.st_size
+    tarinfo.mtime = file_stat.st_mtime
+    return tarinfo
+
+
+def _tar_member(tarinfo: tarfile.TarInfo, data: bytes) -> bytes:
+    """Build a raw *tar* member, i.e. the header followed by the padded content.
+
+    Args:
+        tarinfo: the *tar* header of the member
+        data: the content of the member
+
+    Returns:
+        the raw *tar* member
+
+    """
+    tarinfo.size = len(data)
+    return b''.join((tarinfo.tobuf(tarfile.DEFAULT_FORMAT, tarfile.ENCODING, 'surrogateescape'),
+                     data, tarfile.NUL * (-len(data) % tarfile.BLOCKSIZE)))
+
+
+def _compress_members(items: 'List[Tuple[str, str]]') -> bytes:
+    """Compress a batch of files into a standalone *gzip* member of raw *tar* members.
+
+    The result does not contain the end-of-archive marker, so that results of
+    several batches can be concatenated into one *tar.gz* archive.
+
+    Args:
+        items: a list of names in the archive and paths to the files
+
+    Returns:
+        the compressed *tar* members
+
+    """
+    members = []  # type: List[bytes]
+    for arcname, realname in items:
+        with open(realname, 'rb') as file:
+            file_stat = os.fstat(file.fileno())
+            data = file.read()
+        members.append(_tar_member(_make_tarinfo(arcname, file_stat), data))
+    return gzip.compress(b''.join(members), compresslevel=1)
+
+
+def _dump_lookup_table(lookup_table: 'Dict[str, str]') -> bytes:
+    """Serialize the lookup table of an archive, using :mod:`orjson` if available.
+
+    Args:
+        lookup_table: a mapping from names in the archive to paths of the archived files
+
+    Returns:
+        the serialized lookup table
+
+    """
+    if has_orjson_support:  # pragma: no cover
+        try:
+            return orjson.dumps(lookup_table)
+        except orjson.JSONEncodeError:  # paths with lone surrogates (undecodable file names on POSIX)
+            pass
+    return json.dumps(lookup_table, separators=(',', ':')).encode('utf-8')
+
+
+def _load_lookup_table(data: bytes) -> 'Dict[str, str]':
+    """Deserialize the lookup table of an archive, using :mod:`orjson` if available.
+
+    Args:
+        data: the serialized lookup table
+
+    Returns:
+        a mapping from names in the archive to paths of the archived files
+
+    """
+    if has_orjson_support:  # pragma: no cover
+        try:
+            return orjson.loads(data)  # type: ignore[no-any-return]
+        except orjson.JSONDecodeError:  # escaped lone surrogates written by the json fallback
+            pass
+    return json.loads(data.decode('utf-8'))  # type: ignore[no-any-return]
+
+
 def archive_files(files: 'Iterable[str]', archive_dir: str) -> str:
     """Archive the list of files into a *tar* file.
 
@@ -130,28 +359,108 @@ def archive_files(files: 'Iterable[str]', archive_dir: str) -> str:
         path to the generated *tar* archive
 
     """
-    uuid_gen = UUID4Generator()
-    lookup_table = {uuid_gen.gen() + '.py': file for file in files}  # type: Dict[str, str]
+    files = list(files)
+    nuids = UUID4Generator().gen_many(len(files))
+    lookup_table = {nuid + '.py': file for nuid, file in zip(nuids, files)}  # type: Dict[str, str]
     random_string = binascii.hexlify(os.urandom(8)).decode('ascii')
     archive_file = 'archive-{}-{}.tar'.format(time.strftime('%Y%m%d%H%M%S'), random_string)
-    archive_mode = 'w'
     if has_gz_support:  # pragma: no cover
         archive_file += '.gz'
-        archive_mode += ':gz'
     archive_file = os.path.join(archive_dir, archive_file)
     os.makedirs(archive_dir, exist_ok=True)
-    with tarfile.open(archive_file, archive_mode) as tarf:
-        for arcname, realname in lookup_table.items():
-            tarf.add(realname, arcname)
-        with tempfile.NamedTemporaryFile('w', encoding='utf-8', prefix='bpc-archive-lookup-',
-                                         suffix='.json', delete=False) as tmpf:
-            json.dump(lookup_table, tmpf, indent=4)
-        tarf.add(tmpf.name, LOOKUP_TABLE)
-        with contextlib.suppress(OSError):
-            os.remove(tmpf.name)
+    lookup_info = tarfile.TarInfo(LOOKUP_TABLE)
+    lookup_info.mtime = time.time()
+    lookup_member = _tar_member(lookup_info, _dump_lookup_table(lookup_table))
+    with open(archive_file, 'wb', buffering=_BUFFER_SIZE) as archf:
+        # the lookup table goes first, so that recover_files knows all destinations before reading any file
+        archf.write(gzip.compress(lookup_member, compresslevel=1) if has_gz_support else lookup_member)
+        pending = list(lookup_table.items())
+        if has_gz_support and parallel_available and len(pending) >= _PARALLEL_ARCHIVE_THRESHOLD:
+            # gzip members can be concatenated, so compress batches of files in parallel like pigz does
+            chunksize = -(-len(pending) // (CPU_CNT * 4))
+            batches = [pending[i:i + chunksize] for i in range(0, len(pending), chunksize)]
+            with mp.Pool(processes=CPU_CNT) as pool:  # type: ignore[union-attr]
+                # member order does not matter since the lookup table is already written
+                for compressed in pool.imap_unordered(_compress_members, batches):
+                    archf.write(compressed)
+            pending = []
+
+        # tarfile does not accept compresslevel in stream mode until Python 3.12, so we manage the gzip layer ourselves
+        gzip_layer = (gzip.GzipFile(fileobj=archf, mode='wb', compresslevel=1)
+                      if has_gz_support else nullcontext(archf))
+        with gzip_layer as fileobj, tarfile.open(fileobj=fileobj, mode='w|') as tarf:
+            for arcname, realname in pending:
+                with open(realname, 'rb', buffering=_BUFFER_SIZE) as file:
+                    tarf.addfile(_make_tarinfo(arcname, os.fstat(file.fileno())), file)
     return archive_file
 
 
+def _read_lookup_table(tarf: tarfile.TarFile, member: tarfile.TarInfo) -> 'Dict[str, str]':
+    """Read the lookup table of an archive.
+
+    Args:
+        tarf: the *tar* archive
+        member: the *tar* member of the lookup table
+
+    Returns:
+        a mapping from names in the archive to paths of the archived files
+
+    Raises:
+        BPCRecoveryError: when the lookup table is not a regular file
+
+    """
+    lookupf = tarf.extractfile(member)
+    if lookupf is None:  # pragma: no cover
+        raise BPCRecoveryError('lookup table in the archive is not a regular file')
+    return _load_lookup_table(lookupf.read())
+
+
+def _restore_members(tarf: tarfile.TarFile, lookup_table: 'Dict[str, str]') -> None:
+    """Restore the remaining members of an archive to their original paths.
+
+    Each file is written to a temporary file in its destination directory first, which
+    then replaces the destination, so that read-only files and symlinks are replaced
+    rather than written through. File mode and modification time are restored, and so
+    is the ownership when running as root.
+
+    Args:
+        tarf: the *tar* archive
+        lookup_table: a mapping from names in the archive to paths of the archived files
+
+    Raises:
+        BPCRecoveryError: when some files in the lookup table are missing from the archive
+
+    """
+    restored = set()  # type: Set[str]
+    for member in tarf:
+        if member.name not in lookup_table:  # the lookup table itself
+            continue
+        memberf = tarf.extractfile(member)
+        if memberf is None:  # pragma: no cover
+            continue
+        realname = lookup_table[member.name]
+        dirname = os.path.dirname(realname)
+        os.makedirs(dirname, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(prefix='.bpc-recover-', dir=dirname)
+        try:
+            with open(fd, 'wb') as file:
+                shutil.copyfileobj(memberf, file, _BUFFER_SIZE)
+            if hasattr(os, 'geteuid') and not os.geteuid():  # restore ownership as root, like tarfile does
+                os.chown(tmpname, member.uid, member.gid)
+            os.chmod(tmpname, member.mode)
+            os.utime(tmpname, (member.mtime, member.mtime))
+            os.replace(tmpname, realname)
+        except BaseException:
+            os.remove(tmpname)
+            raise
+        restored.add(member.name)
+
+    missing = sorted(lookup_table[name] for name in lookup_table.keys() - restored)
+    if missing:
+        raise BPCRecoveryError('the following files are missing from the archive: %s'
+                               % ', '.join(map(repr, missing)))
+
+
 def recover_files(archive_file_or_dir: str, *, rr: bool = False, rs: bool = False) -> None:
     """Recover files from a *tar* archive, optionally removing the archive file and archive directory after recovery.
 
@@ -175,7 +484,8 @@ def recover_files(archive_file_or_dir: str, *, rr: bool = False, rs: bool = Fals
     Raises:
         ValueError: when ``rr`` and ``rs`` are both :data:`True`
         BPCRecoveryError: when ``rs`` is :data:`True`, and the directory specified by ``archive_file_or_dir``
-            is empty, contains more than one item, or contains a non-regular file
+            is empty, contains more than one item, or contains a non-regular file; or when some files
+            in the lookup table are missing from the archive (the archive is kept in this case)
 
     """
     if rr and rs:
@@ -192,14 +502,23 @@ def recover_files(archive_file_or_dir: str, *, rr: bool = False, rs: bool = Fals
     else:
         archive_file = archive_file_or_dir
 
-    with tarfile.open(archive_file, 'r') as tarf:
-        with tempfile.TemporaryDirectory(prefix='bpc-archive-extract-') as tmpd:
-            tarf.extractall(tmpd)
-            with open(os.path.join(tmpd, LOOKUP_TABLE), 'r', encoding='utf-8') as lookupf:
-                lookup_table = json.load(lookupf)  # type: Dict[str, str]
-            for arcname, realname in lookup_table.items():
-                os.makedirs(os.path.dirname(realname), exist_ok=True)
-                shutil.move(os.path.join(tmpd, arcname), realname)
+    with open(archive_file, 'rb', buffering=_BUFFER_SIZE) as archf:
+        is_gzip = archf.read(len(_GZIP_MAGIC)) == _GZIP_MAGIC
+        archf.seek(0)
+        # tarfile cannot read concatenated gzip members in stream mode, so we manage the gzip layer ourselves
+        gzip_layer = (gzip.GzipFile(fileobj=archf, mode='rb')
+                      if has_gz_support and is_gzip else nullcontext(archf))
+        with gzip_layer as fileobj, tarfile.open(fileobj=fileobj, mode='r|') as tarf:
+            member = tarf.next()
+            if member is not None and member.name == LOOKUP_TABLE:
+                _restore_members(tarf, _read_lookup_table(tarf, member))
+                legacy_archive = False
+            else:  # archives created by earlier versions have the lookup table at the end
+                legacy_archive = True
+
+    if legacy_archive:
+        with tarfile.open(archive_file, 'r') as tarf:
+            _restore_members(tarf, _read_lookup_table(tarf, tarf.getmember(LOOKUP_TABLE)))
 
     if rr or rs:
         os.remove(archive_file)
@@ -1,20 +1,21 @@
 """Miscellaneous utilities."""
 
+import binascii
 import datetime
 import functools
 import io
 import keyword
 import operator
+import os
 import platform
 import textwrap
-import uuid
 
 from .typing import TYPE_CHECKING, MutableMapping, overload
 
 if TYPE_CHECKING:
     from types import TracebackType  # isort: split
-    from .typing import (Dict, Generator, Iterable, Iterator, List, Mapping, NoReturn, Optional,
-                         Set, T, TextIO, Tuple, Type, Union)
+    from .typing import (Dict, Generator, ItemsView, Iterable, Iterator, KeysView, List, Mapping, NoReturn,
+                         Optional, T, TextIO, Tuple, Type, Union, ValuesView)
 
 # backport contextlib.nullcontext for Python < 3.7
 try:
@@ -74,7 +75,10 @@ def first_truthy(*args):  # type: ignore[no-untyped-def]  # noqa: F811  # pylint
         raise TypeError('no arguments provided')
     if len(args) == 1:
         args = args[0]
-    return next(filter(bool, args), None)
+    for arg in args:
+        if arg:
+            return arg
+    return None
 
 
 @overload
@@ -107,11 +111,20 @@ def first_non_none(*args):  # type: ignore[no-untyped-def]  # noqa: F811  # pyli
         raise TypeError('no arguments provided')
     if len(args) == 1:
         args = args[0]
-    return next(filter(lambda x: x is not None, args), None)
+    for arg in args:
+        if arg is not None:
+            return arg
+    return None
 
 
 class UUID4Generator:
-    """UUID 4 generator wrapper to prevent UUID collisions."""
+    """UUID 4 generator wrapper.
+
+    UUID 4 values carry 122 random bits, so collisions are not tracked.
+
+    """
+
+    __slots__ = ('dash',)
 
     def __init__(self, dash: bool = True) -> None:
         """Constructor of UUID 4 generator wrapper.
@@ -120,24 +133,45 @@ class UUID4Generator:
             dash: whether the generated UUID string has dashes or not
 
         """
-        self.used_uuids = set()  # type: Set[str]
         self.dash = dash
 
     def gen(self) -> str:
-        """Generate a new UUID 4 string that is guaranteed not to collide with used UUIDs.
+        """Generate a new UUID 4 string.
 
         Returns:
             a new UUID 4 string
 
         """
-        while True:
-            new_uuid = uuid.uuid4()
-            nuid = str(new_uuid) if self.dash else new_uuid.hex
-            if nuid not in self.used_uuids:  # pragma: no cover
-                break
-        self.used_uuids.add(nuid)
+        raw = bytearray(os.urandom(16))
+        raw[6] = raw[6] & 0x0f | 0x40  # version 4
+        raw[8] = raw[8] & 0x3f | 0x80  # variant RFC 4122
+        nuid = binascii.hexlify(raw).decode('ascii')
+        if self.dash:
+            return '%s-%s-%s-%s-%s' % (nuid[:8], nuid[8:12], nuid[12:16], nuid[16:20], nuid[20:])
         return nuid
 
+    def gen_many(self, n: int) -> 'List[str]':
+        """Generate a list of new UUID 4 strings at once.
+
+        Random bytes for all UUIDs are drawn with a single :func:`os.urandom` call,
+        and the version and variant bits are set as specified in :rfc:`4122`.
+
+        Args:
+            n: the number of UUID 4 strings to generate
+
+        Returns:
+            a list of ``n`` new UUID 4 strings
+
+        """
+        raw = bytearray(os.urandom(16 * n))
+        raw[6::16] = bytes(b & 0x0f | 0x40 for b in raw[6::16])  # version 4
+        raw[8::16] = bytes(b & 0x3f | 0x80 for b in raw[8::16])  # variant RFC 4122
+        hex_string = binascii.hexlify(raw).decode('ascii')
+        nuids = [hex_string[i:i + 32] for i in range(0, 32 * n, 32)]
+        if self.dash:
+            return ['%s-%s-%s-%s-%s' % (h[:8], h[8:12], h[12:16], h[16:20], h[20:]) for h in nuids]
+        return nuids
+
 
 class MakeTextIO:
     """Context wrapper class to handle :obj:`str` and *file* objects together.
@@ -223,8 +257,7 @@ class Config(MutableMapping[str, object]):
     """
 
     def __init__(self, **kwargs: object) -> None:
-        for name, value in kwargs.items():
-            setattr(self, name, value)
+        self.__dict__.update(kwargs)
 
     def __contains__(self, key: object) -> bool:
         return key in self.__dict__
@@ -244,6 +277,20 @@ class Config(MutableMapping[str, object]):
     def __delitem__(self, key: str) -> None:
         del self.__dict__[key]
 
+    # The following methods bypass the generic implementations of the mixin methods of MutableMapping.
+
+    def get(self, key: str, default: object = None) -> object:
+        return self.__dict__.get(key, default)
+
+    def keys(self) -> 'KeysView[str]':
+        return self.__dict__.keys()
+
+    def values(self) -> 'ValuesView[object]':
+        return self.__dict__.values()
+
+    def items(self) -> 'ItemsView[str, object]':
+        return self.__dict__.items()
+
     def __eq__(self, other: object) -> bool:
         return isinstance(other, Config) and self.__dict__ == other.__dict__
 
@@ -3,54 +3,64 @@
 import os
 
 from .misc import nullcontext
-from .typing import TYPE_CHECKING
+from .typing import TYPE_CHECKING, cast
 
 if TYPE_CHECKING:
     from types import ModuleType  # isort: split
     from .typing import Callable, ContextManager, Iterable, List, Mapping, Optional, T, Tuple
 
-# multiprocessing support detection and CPU_CNT retrieval
+# multiprocessing support detection
 try:        # try first
     import multiprocessing
 except ImportError:  # pragma: no cover
     multiprocessing = None  # type: ignore[assignment]
-else:       # CPU number if multiprocessing supported
-    if os.name == 'posix' and 'SC_NPROCESSORS_CONF' in getattr(os, 'sysconf_names'):  # pragma: no cover
-        CPU_CNT = getattr(os, 'sysconf')('SC_NPROCESSORS_CONF')
-    elif hasattr(os, 'sched_getaffinity'):  # pragma: no cover
-        CPU_CNT = len(getattr(os, 'sched_getaffinity')(0))
-    else:  # pragma: no cover
-        CPU_CNT = os.cpu_count() or 1
 finally:    # alias and aftermath
     mp = multiprocessing  # type: Optional[ModuleType]
     del multiprocessing
 
+# CPU_CNT retrieval
+if os.name == 'posix' and 'SC_NPROCESSORS_CONF' in getattr(os, 'sysconf_names'):  # pragma: no cover
+    CPU_CNT = getattr(os, 'sysconf')('SC_NPROCESSORS_CONF')
+elif hasattr(os, 'sched_getaffinity'):  # pragma: no cover
+    CPU_CNT = len(getattr(os, 'sched_getaffinity')(0))
+else:  # pragma: no cover
+    CPU_CNT = os.cpu_count() or 1
+
 parallel_available = mp is not None and CPU_CNT > 1
 
 
-def _mp_map_wrapper(args: 'Tuple[Callable[..., T], Iterable[object], Mapping[str, object]]') -> 'T':
-    """Map wrapper function for :mod:`multiprocessing`.
+def _mp_task_wrapper(args: 'Tuple[int, object]') -> 'Tuple[int, object]':
+    """Task wrapper function for :mod:`multiprocessing`.
+
+    The task function and its additional arguments are sent to each worker process only once
+    (see :func:`_mp_init_worker`), so that only the items need to be sent with the tasks.
 
     Args:
-        args: the function to execute, the positional arguments and the keyword arguments packed into a tuple
+        args: the index of the task and the item to process
 
     Returns:
-        the function execution result
+        the index of the task and the function execution result
 
     """
-    func, posargs, kwargs = args
-    return func(*posargs, **kwargs)
+    index, item = args
+    func, posargs, kwargs = cast('Tuple[Callable[..., object], Tuple[object, ...], Mapping[str, object]]', _task)
+    return index, func(item, *posargs, **kwargs)
 
 
-def _mp_init_lock(lock: 'ContextManager[None]') -> None:  # pragma: no cover
-    """Initialize lock for :mod:`multiprocessing`.
+def _mp_init_worker(lock: 'ContextManager[None]', func: 'Callable[..., object]', posargs: 'Tuple[object, ...]',
+                    kwargs: 'Mapping[str, object]') -> None:  # pragma: no cover
+    """Initialize worker processes for :mod:`multiprocessing`.
 
     Args:
         lock: the lock to be shared among tasks
+        func: the task function to execute
+        posargs: additional positional arguments to pass to ``func``
+        kwargs: keyword arguments to pass to ``func``
 
     """
-    global task_lock  # pylint: disable=global-statement
+    global task_lock, _task  # pylint: disable=global-statement
     task_lock = lock
+    _task = (func, posargs, kwargs)
 
 
 def map_tasks(func: 'Callable[..., T]', iterable: 'Iterable[object]', posargs: 'Optional[Iterable[object]]' = None,
@@ -83,18 +93,22 @@ def map_tasks(func: 'Callable[..., T]', iterable: 'Iterable[object]', posargs: '
 
     # parallel execution
     processes = processes or CPU_CNT
+    items = list(iterable)
+    if chunksize is None:  # same heuristic as multiprocessing.pool.Pool.map
+        chunksize = -(-len(items) // (processes * 4)) or 1
+    result = [cast('T', None)] * len(items)
     lock = mp.Lock()  # type: ignore[union-attr]
-    with mp.Pool(processes=processes, initializer=_mp_init_lock, initargs=(lock,)) as pool:  # type: ignore[union-attr]
-        result = pool.map(
-            _mp_map_wrapper,
-            [(func, (item,) + tuple(posargs), kwargs) for item in iterable],
-            chunksize
-        )  # type: List[T]
+    with mp.Pool(processes=processes, initializer=_mp_init_worker,  # type: ignore[union-attr]
+                 initargs=(lock, func, tuple(posargs), kwargs)) as pool:
+        # collect results as soon as they are ready, then put them back in order
+        for index, value in pool.imap_unordered(_mp_task_wrapper, enumerate(items), chunksize):
+            result[index] = cast('T', value)
     task_lock = nullcontext()
     return result
 
 
 task_lock = nullcontext()  # type: ContextManager[None]
+_task = None  # type: Optional[Tuple[Callable[..., object], Tuple[object, ...], Mapping[str, object]]]
 
 
 def TaskLock() -> 'ContextManager[None]':
@@ -1,6 +1,6 @@
 """Functions for parsing Python source code."""
 
-import glob
+import functools
 import io
 import os
 import re
@@ -13,13 +13,19 @@ from .misc import MakeTextIO, first_non_none
 from .typing import TYPE_CHECKING, cast
 
 if TYPE_CHECKING:
-    from .typing import Dict, Linesep, List, Literal, Optional, TextIO, Tuple, Union
+    from .typing import Linesep, List, Optional, TextIO, Tuple, Union
 
-PARSO_GRAMMAR_VERSIONS = []  # type: List[Tuple[int, int]]
-for grammar_file in glob.iglob(os.path.join(parso.__path__[0], 'python', 'grammar*.txt')):  # type: ignore[attr-defined]
-    grammar_version = os.path.basename(grammar_file)[7:-4]
-    PARSO_GRAMMAR_VERSIONS.append((int(grammar_version[0]), int(grammar_version[1:])))
-PARSO_GRAMMAR_VERSIONS = sorted(PARSO_GRAMMAR_VERSIONS)
+PARSO_GRAMMAR_VERSIONS = sorted(
+    (int(grammar_file[7]), int(grammar_file[8:-4]))
+    for grammar_file in os.listdir(os.path.join(parso.__path__[0], 'python'))  # type: ignore[attr-defined]
+    if grammar_file.startswith('grammar') and grammar_file.endswith('.txt')
+)  # type: List[Tuple[int, int]]
+
+#: Tuple[str, ...]: Python versions that parso supports to parse grammar, formatted as strings.
+_PARSO_GRAMMAR_VERSION_STRINGS = tuple('{}.{}'.format(*v) for v in PARSO_GRAMMAR_VERSIONS)  # type: Tuple[str, ...]
+
+#: str: The latest Python version that parso supports to parse grammar.
+_LATEST_GRAMMAR_VERSION = _PARSO_GRAMMAR_VERSION_STRINGS[-1]  # type: str
 
 
 def get_parso_grammar_versions(minimum: 'Optional[str]' = None) -> 'List[str]':
@@ -37,14 +43,14 @@ def get_parso_grammar_versions(minimum: 'Optional[str]' = None) -> 'List[str]':
 
     """
     if minimum is None:
-        minimum_tuple = ()  # type: Tuple[int, ...]
-    else:
-        if not isinstance(minimum, str):
-            raise TypeError('minimum version should be a string')
-        if not re.fullmatch(r'(?:0|[1-9][0-9]*)\.(?:0|[1-9][0-9]*)', minimum):
-            raise ValueError('invalid minimum version')
-        minimum_tuple = tuple(map(int, minimum.split('.')))
-    return ['{}.{}'.format(*v) for v in PARSO_GRAMMAR_VERSIONS if v >= minimum_tuple]
+        return list(_PARSO_GRAMMAR_VERSION_STRINGS)
+    if not isinstance(minimum, str):
+        raise TypeError('minimum version should be a string')
+    if not re.fullmatch(r'(?:0|[1-9][0-9]*)\.(?:0|[1-9][0-9]*)', minimum):
+        raise ValueError('invalid minimum version')
+    minimum_tuple = tuple(map(int, minimum.split('.')))
+    return [version for version_tuple, version in zip(PARSO_GRAMMAR_VERSIONS, _PARSO_GRAMMAR_VERSION_STRINGS)
+            if version_tuple >= minimum_tuple]
 
 
 class BPCSyntaxError(SyntaxError):
@@ -67,8 +73,31 @@ def detect_encoding(code: bytes) -> str:
     """
     if not isinstance(code, bytes):
         raise TypeError("'code' should be bytes")
-    with io.BytesIO(code) as file:
-        return tokenize.detect_encoding(file.readline)[0]
+    # only the first two lines are needed, so slice them out instead of wrapping the whole code in a buffer
+    first_end = code.find(b'\n') + 1 or len(code)
+    second_end = code.find(b'\n', first_end) + 1 or len(code)
+    lines = iter((code[:first_end], code[first_end:second_end]))
+    return tokenize.detect_encoding(functools.partial(next, lines, b''))[0]
+
+
+def _get_text(code: 'Union[str, bytes, TextIO, parso.tree.NodeOrLeaf]') -> str:
+    """Get the source code text from the various forms of code accepted by the detection functions.
+
+    Args:
+        code: the code to get text from
+
+    Returns:
+        the source code text, decoded with :func:`detect_encoding` if ``code`` is :obj:`bytes`
+
+    """
+    if isinstance(code, str):
+        return code
+    if isinstance(code, bytes):
+        return code.decode(detect_encoding(code))
+    if isinstance(code, parso.tree.NodeOrLeaf):
+        return code.get_code()  # type: ignore[no-any-return]
+    with MakeTextIO(code) as file:
+        return file.read()
 
 
 def detect_linesep(code: 'Union[str, bytes, TextIO, parso.tree.NodeOrLeaf]') -> 'Linesep':
@@ -86,28 +115,13 @@ def detect_linesep(code: 'Union[str, bytes, TextIO, parso.tree.NodeOrLeaf]') ->
         When there is a tie, prefer ``LF`` to ``CRLF``, prefer ``CRLF`` to ``CR``.
 
     """
-    if isinstance(code, parso.tree.NodeOrLeaf):
-        code = code.get_code()
-    if isinstance(code, bytes):
-        code = code.decode(detect_encoding(code))
-
-    pool = {
-        'CR': 0,
-        'CRLF': 0,
-        'LF': 0,
-    }  # type: Dict[Literal['CR', 'CRLF', 'LF'], int]
-
-    with MakeTextIO(cast('Union[str, TextIO]', code)) as file:
-        for line in file:
-            if line.endswith('\r'):
-                pool['CR'] += 1
-            elif line.endswith('\r\n'):
-                pool['CRLF'] += 1
-            elif line.endswith('\n'):
-                pool['LF'] += 1
+    text = _get_text(code)
+    crlf = text.count('\r\n')
+    lf = text.count('\n') - crlf
+    cr = text.count('\r') - crlf
 
     # when there is a tie, prefer LF to CRLF, prefer CRLF to CR
-    return cast('Linesep', max((pool['LF'], 3, '\n'), (pool['CRLF'], 2, '\r\n'), (pool['CR'], 1, '\r'))[2])
+    return cast('Linesep', max((lf, 3, '\n'), (crlf, 2, '\r\n'), (cr, 1, '\r'))[2])
 
 
 def detect_indentation(code: 'Union[str, bytes, TextIO, parso.tree.NodeOrLeaf]') -> str:
@@ -130,38 +144,46 @@ def detect_indentation(code: 'Union[str, bytes, TextIO, parso.tree.NodeOrLeaf]')
         When there is a tie between *spaces* and *tabs*, prefer **4 spaces** for :pep:`8`.
 
     """
-    if isinstance(code, parso.tree.NodeOrLeaf):
-        code = code.get_code()
-    if isinstance(code, bytes):
-        code = code.decode(detect_encoding(code))
+    text = _get_text(code)
 
-    pool = {
-        'space': 0,
-        'tab': 0
-    }  # type: Dict[Literal['space', 'tab'], int]
+    spaces = tabs = 0
     min_spaces = None  # type: Optional[int]
 
-    with MakeTextIO(cast('Union[str, TextIO]', code)) as file:
-        for token_info in tokenize.generate_tokens(file.readline):
-            if token_info.type == token.INDENT:
-                if '\t' in token_info.string and ' ' in token_info.string:
-                    continue  # skip indentation with mixed spaces and tabs
-                if '\t' in token_info.string:
-                    pool['tab'] += 1
+    readline = io.StringIO(text, newline='').readline  # turn off newline translation
+    for token_info in tokenize.generate_tokens(readline):
+        if token_info.type == token.INDENT:
+            if '\t' in token_info.string and ' ' in token_info.string:
+                continue  # skip indentation with mixed spaces and tabs
+            if '\t' in token_info.string:
+                tabs += 1
+            else:
+                spaces += 1
+                if min_spaces is None:
+                    min_spaces = len(token_info.string)
                 else:
-                    pool['space'] += 1
-                    if min_spaces is None:
-                        min_spaces = len(token_info.string)
-                    else:
-                        min_spaces = min(min_spaces, len(token_info.string))
+                    min_spaces = min(min_spaces, len(token_info.string))
 
-    if pool['space'] > pool['tab']:
+    if spaces > tabs:
         return ' ' * cast(int, min_spaces)
-    if pool['space'] < pool['tab']:
+    if spaces < tabs:
         return '\t'
     return ' ' * 4  # same number of spaces and tabs, prefer 4 spaces for PEP 8
 
 
+@functools.lru_cache(maxsize=None)
+def _load_grammar(version: str) -> 'parso.Grammar[parso.python.tree.Module]':
+    """Load the parso grammar of a Python version, caching the result.
+
+    Args:
+        version: the Python version of the grammar
+
+    Returns:
+        the parso grammar
+
+    """
+    return parso.load_grammar(version=version)  # type: ignore[no-any-return]
+
+
 def parso_parse(code: 'Union[str, bytes]', filename: 'Optional[str]' = None, *,
                 version: 'Optional[str]' = None) -> 'parso.python.tree.Module':
     """Parse Python source code with parso.
@@ -179,18 +201,20 @@ def parso_parse(code: 'Union[str, bytes]', filename: 'Optional[str]' = None, *,
 
     """
     filename = first_non_none(filename, '<unknown>')
-    grammar = parso.load_grammar(version=version if version is not None else get_parso_grammar_versions()[-1])
+    grammar = _load_grammar(version if version is not None else _LATEST_GRAMMAR_VERSION)
     if isinstance(code, bytes):
         try:
             code = code.decode(detect_encoding(code))
         except SyntaxError as e:
             raise BPCSyntaxError('failed to detect encoding for source file %r: %s' % (filename, e)) from None
     module = grammar.parse(code, error_recovery=True)  # type: parso.python.tree.Module
-    errors = grammar.iter_errors(module)
-    if errors:
-        error_messages = '\n'.join('[L%dC%d] %s' % (error.start_pos + (error.message,)) for error in errors)
-        raise BPCSyntaxError('source file %r contains the following syntax errors:\n%s' % (filename, error_messages))
-    return module
+    # parso documents ``iter_errors`` as returning a generator (though it currently returns a list),
+    # so materialize it before testing for emptiness
+    errors = list(grammar.iter_errors(module))
+    if not errors:
+        return module
+    error_messages = '\n'.join('[L%dC%d] %s' % (error.start_pos + (error.message,)) for error in errors)
+    raise BPCSyntaxError('source file %r contains the following syntax errors:\n%s' % (filename, error_messages))
 
 
 __all__ = ['get_parso_grammar_versions', 'BPCSyntaxError', 'detect_encoding', 'detect_linesep', 'detect_indentation',
@@ -3,8 +3,8 @@
 """Type annotations for this package."""
 import os
 import sys
-from typing import (Callable, Dict, Generator, Iterable, Iterator, List, Mapping, Optional, Set,
-                    TextIO, Tuple, TypeVar, Union, cast)
+from typing import (Callable, Dict, Generator, ItemsView, Iterable, Iterator, KeysView, List, Mapping, Optional, Set,
+                    TextIO, Tuple, TypeVar, Union, ValuesView, cast)
 
 from typing_extensions import ContextManager, Deque, Final, Literal, NoReturn, Type, final, overload
 
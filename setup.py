@@ -62,12 +62,16 @@ setup(
             'colorlabels>=0.7.0',
             'parso>=0.8.0',
             'pytest>=6.2.0',
+            'orjson',
         ],
         'test': [
             'pytest>=4.5.0',
             'pytest-doctestplus>=0.5.0',
             'coverage',
         ],
+        'speedups': [
+            'orjson;python_version>="3.7"',
+        ],
         'docs': [
             'Sphinx',
             'sphinx-autodoc-typehints',
@@ -56,6 +56,8 @@ def test_parse_positive_integer_error(s: 'Optional[Union[str, int]]', exc: 'Type
         ('n', False),
         ('FALSE', False),
         ('Off', False),
+        ('yEs', True),
+        ('fAlSe', False),
     ]
 )
 def test_parse_boolean_state(s: 'Optional[str]', result: 'Optional[bool]') -> None:
@@ -85,6 +87,7 @@ def test_parse_boolean_state_error(s: 'Optional[str]', exc: 'Type[BaseException]
         ('LF', '\n'),
         ('CRLF', '\r\n'),
         ('cr', '\r'),
+        ('CrLf', '\r\n'),
     ]
 )
 def test_parse_linesep(s: 'Optional[str]', result: 'Optional[Linesep]') -> None:
@@ -112,6 +115,7 @@ def test_parse_linesep_error(s: 'Optional[str]', exc: 'Type[BaseException]', msg
         ('tab', '\t'),
         ('Tab', '\t'),
         ('TAB', '\t'),
+        ('tAb', '\t'),
         ('\t', '\t'),
         ('2', ' ' * 2),
         (2, ' ' * 2),
@@ -73,6 +73,68 @@ def test_BaseContext() -> None:
     context = MagicContext(parso_parse('123').children[0], config)
     assert context.string == '123 \u0200 '
 
+    # code pieces are joined on read, and can be replaced as a whole
+    context = MagicContext(parso_parse('123'), config)
+    context += 'a'
+    context += 'b'
+    assert context._prefix == '789ab'  # pylint: disable=protected-access
+    context._prefix = 'c'  # pylint: disable=protected-access
+    context += 'd'
+    assert context._prefix == 'cd'  # pylint: disable=protected-access
+    context._suffix = 'e'  # pylint: disable=protected-access
+    assert context._suffix == 'e'  # pylint: disable=protected-access
+
+
+class MagicSubContext(MagicContext):
+    """A test context class overriding a processing method."""
+
+    def _process_number(self, node: 'parso.python.tree.Number') -> None:
+        """Process number nodes.
+
+        Args:
+            node: a number node
+
+        """
+        self += node.prefix + '0'
+
+
+class MagicStaticContext(MagicContext):
+    """A test context class overriding processing methods with static and class methods."""
+
+    @staticmethod
+    def _process_name(node: 'parso.python.tree.Name') -> None:
+        """Process name nodes.
+
+        Args:
+            node: a name node
+
+        """
+        node.value = 'x'
+
+    @classmethod
+    def _process_operator(cls, node: 'parso.python.tree.Operator') -> None:
+        """Process operator nodes.
+
+        Args:
+            node: an operator node
+
+        """
+        assert cls is MagicStaticContext
+        node.value = '+='
+
+
+def test_BaseContext_process_table() -> None:
+    config = Config(indentation='\t', linesep='\n', pep8=True)
+    context = MagicSubContext(parso_parse('test = 123; "test"'), config, raw=True)
+    assert context.string == "test = 0; 'testnb'"
+    table = MagicContext._get_process_table()  # pylint: disable=protected-access
+    sub_table = MagicSubContext._get_process_table()  # pylint: disable=protected-access
+    assert table == sub_table == {'number': '_process_number', 'string': '_process_string'}
+
+    module = parso_parse('test = 123')
+    MagicStaticContext(module, config, raw=True)
+    assert module.get_code() == 'x += 789'
+
 
 @pytest.mark.parametrize(
     'code,linesep,result',
@@ -83,6 +145,9 @@ def test_BaseContext() -> None:
         ('# comment\rprint(666)\r', '\r', ('# comment\r', 'print(666)\r')),
         ('# c1\n #c2\nprint(666)\n', '\n', ('# c1\n #c2\n', 'print(666)\n')),
         ('# coding: gbk\n \n# comment\nprint(666)\n', '\n', ('# coding: gbk\n', ' \n# comment\nprint(666)\n')),
+        ('# c1\r\n# c2\r\n', '\r\n', ('# c1\r\n# c2\r\n', '')),
+        ('# c1\r\n# c2', '\r\n', ('# c1\r\n# c2', '')),
+        ('', '\n', ('', '')),
     ]
 )
 def test_BaseContext_split_comments(code: str, linesep: 'Linesep', result: 'Tuple[str, str]') -> None:
@@ -103,6 +168,8 @@ def test_BaseContext_split_comments(code: str, linesep: 'Linesep', result: 'Tupl
         ('test', '', 2, '\n', 2),
         ('', 'test', 2, '\n', 2),
         ('', '', 2, '\n', 2),
+        ('test\r\n \r\n', '\t\r\ntest', 3, '\r\n', 1),
+        ('\n', '\n', 4, '\n', 1),
     ]
 )
 def test_BaseContext_missing_newlines(prefix: str, suffix: str, expected: int, linesep: 'Linesep', result: int) -> None:
@@ -118,6 +185,8 @@ def test_BaseContext_missing_newlines(prefix: str, suffix: str, expected: int, l
         ('\r\ntest = "test", 123, "test", 123', ('\r\n', '')),
         ('test = 1', ('', '')),
         ('', ('', '')),
+        (' \n\t', (' \n\t', ' \n\t')),
+        ('\vtest\v', ('', '')),
     ]
 )
 def test_BaseContext_extract_whitespaces(code: str, result: 'Tuple[str, str]') -> None:
@@ -1,4 +1,5 @@
 import inspect
+import json
 import os
 import re
 import sys
@@ -8,14 +9,15 @@ from pathlib import Path
 import pytest
 
 from bpc_utils import BPCRecoveryError, archive_files, detect_files, recover_files
-from bpc_utils.fileprocessing import LOOKUP_TABLE, expand_glob_iter, is_python_filename
+from bpc_utils.fileprocessing import (LOOKUP_TABLE, _dump_lookup_table, _load_lookup_table, expand_glob_iter,
+                                      has_orjson_support, is_python_filename)
 from bpc_utils.misc import is_windows
 from bpc_utils.typing import TYPE_CHECKING
 
 from .testutils import read_text_file, write_text_file
 
 if TYPE_CHECKING:
-    from bpc_utils.typing import List, Tuple  # isort: split
+    from bpc_utils.typing import Dict, List, Tuple  # isort: split
     from .testutils import MonkeyPatch, TempPathFactory
 
 
@@ -66,6 +68,8 @@ def setup_files_for_tests(tmp_path_factory: 'TempPathFactory', monkeypatch_class
         ('README.md', False),
         ('myscript', False),
         ('.hidden.py', True),
+        (os.path.join('fake.py', 'README.md'), False),
+        (os.path.join('dir', 'd.py'), True),
     ]
 )
 def test_is_python_filename(filename: str, result: bool) -> None:
@@ -76,6 +80,24 @@ def test_expand_glob_iter_is_generator() -> None:
     assert inspect.isgenerator(expand_glob_iter('*'))
 
 
+@pytest.mark.parametrize(
+    'lookup_table',
+    [
+        {'a.py': '/path/to/a.py', 'b.py': '/path/to/\u4e2d\u6587.py'},
+        {'c.py': '/path/to/bad\udcff.py'},  # undecodable file name as returned by os.fsdecode on POSIX
+    ]
+)
+@pytest.mark.parametrize('use_orjson', [False, True])
+def test_lookup_table_serialization(use_orjson: bool, lookup_table: 'Dict[str, str]',
+                                    monkeypatch: 'MonkeyPatch') -> None:
+    if use_orjson and not has_orjson_support:  # pragma: no cover
+        pytest.skip('orjson is not available')
+    monkeypatch.setattr(sys.modules['bpc_utils.fileprocessing'], 'has_orjson_support', use_orjson)
+    data = _dump_lookup_table(lookup_table)
+    assert isinstance(data, bytes)
+    assert _load_lookup_table(data) == lookup_table
+
+
 def test_BPCRecoveryError() -> None:
     assert issubclass(BPCRecoveryError, RuntimeError)
 
@@ -111,6 +133,8 @@ class TestFileProcessingReadOnly:
         (['myscript'], ['myscript']),
         (['myscript', '.'], ['myscript', 'a.py', 'c.pyw', 'prefix1.py', 'prefix2.py', '.hidden.py', 'dir/d.py',
                              'dir/e.pyw', 'dir/bpy.py', 'fake.py/f.py', '.hidden_dir/g.py']),
+        # files given both directly and through their directory should be returned only once
+        (['dir/d.py', 'dir'], ['dir/d.py', 'dir/e.pyw', 'dir/bpy.py']),
     ]  # type: List[Tuple[List[str], List[str]]]
 
     if is_windows:  # pragma: no cover
@@ -121,7 +145,10 @@ class TestFileProcessingReadOnly:
         detect_files_test_cases.append((['*.py'], []))  # glob expansion should not be performed on Unix-like platforms
 
     @pytest.mark.parametrize('files,result', detect_files_test_cases)
-    def test_detect_files(self, files: 'List[str]', result: 'List[str]') -> None:  # pylint: disable=no-self-use
+    @pytest.mark.parametrize('scan_threshold', [1, 4])
+    def test_detect_files(self, files: 'List[str]', result: 'List[str]',  # pylint: disable=no-self-use
+                          scan_threshold: int, monkeypatch: 'MonkeyPatch') -> None:
+        monkeypatch.setattr(sys.modules['bpc_utils.fileprocessing'], '_PARALLEL_SCAN_THRESHOLD', scan_threshold)
         assert sorted(detect_files(files)) == sorted(map(os.path.abspath, result))  # type: ignore[arg-type]
 
 
@@ -142,7 +169,7 @@ def test_archive_and_restore(rr: bool, rs: bool) -> None:
     with tarfile.open(archive_file, 'r') as tarf:
         items = tarf.getnames()
         assert len(items) == 4
-        assert LOOKUP_TABLE in items
+        assert items[0] == LOOKUP_TABLE
         assert sum(x.endswith('.py') for x in items) == 3
     write_text_file('a.py', '[redacted]')
     write_text_file(os.path.join('dir', 'e.pyw'), '[redacted]')
@@ -161,6 +188,69 @@ def test_archive_and_restore(rr: bool, rs: bool) -> None:
         assert os.path.isfile(archive_file)
 
 
+def test_recover_files_lookup_table_at_end(tmp_path: Path, monkeypatch: 'MonkeyPatch') -> None:
+    monkeypatch.chdir(tmp_path)
+    write_text_file('a.py', 'aaa')
+    write_text_file('lookup.json', json.dumps({'a-archived.py': os.path.abspath('a.py')}))
+    with tarfile.open('archive.tar.gz', 'w:gz') as tarf:
+        tarf.add('a.py', 'a-archived.py')
+        tarf.add('lookup.json', LOOKUP_TABLE)
+    write_text_file('a.py', '[redacted]')
+    recover_files('archive.tar.gz')
+    assert read_text_file('a.py') == 'aaa'
+
+
+def test_recover_files_missing_member(tmp_path: Path, monkeypatch: 'MonkeyPatch') -> None:
+    monkeypatch.chdir(tmp_path)
+    write_text_file('a.py', 'aaa')
+    write_text_file('lookup.json', json.dumps({'a-archived.py': os.path.abspath('a.py'),
+                                               'y-archived.py': os.path.abspath('y.py')}))
+    with tarfile.open('archive.tar.gz', 'w:gz') as tarf:
+        tarf.add('lookup.json', LOOKUP_TABLE)
+        tarf.add('a.py', 'a-archived.py')
+    write_text_file('a.py', '[redacted]')
+    with pytest.raises(BPCRecoveryError, match=re.escape('missing from the archive: %r' % os.path.abspath('y.py'))):
+        recover_files('archive.tar.gz', rr=True)
+    assert read_text_file('a.py') == 'aaa'
+    assert os.path.isfile('archive.tar.gz')
+
+
+@pytest.mark.skipif(is_windows, reason='POSIX file modes and symlinks')
+def test_recover_files_replace_destination(tmp_path: Path, monkeypatch: 'MonkeyPatch') -> None:
+    monkeypatch.chdir(tmp_path)
+    write_text_file('a.py', 'aaa')
+    write_text_file('b.py', 'bbb')
+    os.chmod('a.py', 0o444)
+    archive_file = archive_files([os.path.abspath('a.py'), os.path.abspath('b.py')], 'archive')
+    os.chmod('a.py', 0o644)
+    write_text_file('a.py', '[redacted]')
+    os.chmod('a.py', 0o444)
+    os.remove('b.py')
+    write_text_file('target.py', 'target')
+    os.symlink('target.py', 'b.py')
+    recover_files(archive_file)
+    assert read_text_file('a.py') == 'aaa'
+    assert os.stat('a.py').st_mode & 0o777 == 0o444
+    assert not os.path.islink('b.py')
+    assert read_text_file('b.py') == 'bbb'
+    assert read_text_file('target.py') == 'target'
+    assert sorted(os.listdir('.')) == ['a.py', 'archive', 'b.py', 'target.py']
+
+
+@pytest.mark.skipif(not hasattr(os, 'geteuid') or bool(os.geteuid()), reason='changing file ownership requires root')
+def test_recover_files_ownership(tmp_path: Path, monkeypatch: 'MonkeyPatch') -> None:  # pragma: no cover
+    monkeypatch.chdir(tmp_path)
+    write_text_file('a.py', 'aaa')
+    os.chown('a.py', 1234, 1234)
+    archive_file = archive_files([os.path.abspath('a.py')], 'archive')
+    os.chown('a.py', 0, 0)
+    write_text_file('a.py', '[redacted]')
+    recover_files(archive_file)
+    assert read_text_file('a.py') == 'aaa'
+    file_stat = os.stat('a.py')
+    assert (file_stat.st_uid, file_stat.st_gid) == (1234, 1234)
+
+
 def test_recover_files_both_rr_rs() -> None:
     with pytest.raises(ValueError, match=re.escape("cannot use 'rr' and 'rs' at the same time")):
         recover_files(os.devnull, rr=True, rs=True)
@@ -177,3 +267,23 @@ def test_recover_files_rs_errors(tmp_path: Path, monkeypatch: 'MonkeyPatch') ->
     Path('file').unlink()
     with pytest.raises(BPCRecoveryError, match=re.escape("item 'dir' in '.' is not a regular file")):
         recover_files('.', rs=True)
+
+
+def test_archive_and_restore_parallel(tmp_path: Path, monkeypatch: 'MonkeyPatch') -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys.modules['bpc_utils.fileprocessing'], '_PARALLEL_ARCHIVE_THRESHOLD', 1)
+    monkeypatch.setattr(sys.modules['bpc_utils.fileprocessing'], 'parallel_available', True)
+    monkeypatch.setattr(sys.modules['bpc_utils.fileprocessing'], 'CPU_CNT', 2)
+    file_list = [os.path.abspath('file{}.py'.format(i)) for i in range(20)]  # type: List[str]
+    for i, file in enumerate(file_list):
+        write_text_file(file, 'content{}'.format(i) * i)
+    archive_file = archive_files(file_list, 'archive')
+    with tarfile.open(archive_file, 'r') as tarf:
+        items = tarf.getnames()
+        assert len(items) == 21
+        assert items[0] == LOOKUP_TABLE
+    for file in file_list:
+        write_text_file(file, '[redacted]')
+    recover_files(archive_file)
+    for i, file in enumerate(file_list):
+        assert read_text_file(file) == 'content{}'.format(i) * i
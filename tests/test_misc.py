@@ -4,6 +4,7 @@ import re
 import socket
 import sys
 import textwrap
+import uuid
 
 import pytest
 
@@ -120,6 +121,26 @@ def test_uuid_gen(dash: bool) -> None:
     uuids = [uuid_gen.gen() for _ in range(1000)]
     assert all(('-' in x) == dash for x in uuids)
     assert len(uuids) == len(set(uuids))
+    for x in uuids:
+        nuid = uuid.UUID(x)
+        assert (str(nuid) if dash else nuid.hex) == x
+        assert nuid.version == 4
+        assert nuid.variant == uuid.RFC_4122
+
+
+@pytest.mark.parametrize('dash', [True, False])
+def test_uuid_gen_many(dash: bool) -> None:
+    uuid_gen = UUID4Generator(dash=dash)
+    uuids = uuid_gen.gen_many(1000)
+    assert len(uuids) == 1000
+    assert all(('-' in x) == dash for x in uuids)
+    assert len(uuids) == len(set(uuids))
+    for x in uuids:
+        nuid = uuid.UUID(x)
+        assert (str(nuid) if dash else nuid.hex) == x
+        assert nuid.version == 4
+        assert nuid.variant == uuid.RFC_4122
+    assert uuid_gen.gen_many(0) == []
 
 
 def test_MakeTextIO_str() -> None:
@@ -191,6 +212,11 @@ def test_Config() -> None:
     assert config['xxx'] == 'yyy'
 
     assert dict(Config(a=1, b=2)) == {'a': 1, 'b': 2}
+    assert Config(a=1).get('a') == 1
+    assert Config(a=1).get('b') is None
+    assert Config(a=1).get('b', 2) == 2
+    assert sorted(Config(a=1, b=2).keys()) == ['a', 'b']
+    assert list(Config(a=1, b=2).values()) == [1, 2]
     assert Config(a=1, b=2) == Config(b=2, a=1)
     assert Config(a=1, b=2) != {'a': 1, 'b': 2}
     assert Config(a=1, b=2) != Config(b=1, a=2)
@@ -8,7 +8,7 @@ import textwrap
 import pytest
 
 from bpc_utils import Config, TaskLock, map_tasks
-from bpc_utils.multiprocessing import _mp_map_wrapper, parallel_available
+from bpc_utils.multiprocessing import _mp_task_wrapper, parallel_available
 from bpc_utils.typing import TYPE_CHECKING
 
 from .testutils import write_text_file
@@ -34,16 +34,18 @@ def lock_user_multiple_times(x: int) -> int:
 
 
 @pytest.mark.parametrize(
-    'args,result',
+    'task,args,result',
     [
-        ((square, (6,), {}), 36),
-        ((square, range(6, 7), {}), 36),
-        ((int, ('0x10',), {'base': 16}), 16),
-        ((int, ('0x10',), Config(base=16)), 16),
+        ((square, (), {}), (0, 6), (0, 36)),
+        ((divmod, (3,), {}), (1, 7), (1, (2, 1))),
+        ((int, (), {'base': 16}), (2, '0x10'), (2, 16)),
+        ((int, (), Config(base=16)), (3, '0x10'), (3, 16)),
     ]
 )
-def test__mp_map_wrapper(args: 'Tuple[Callable[..., T], Iterable[object], Mapping[str, object]]', result: 'T') -> None:
-    assert _mp_map_wrapper(args) == result
+def test__mp_task_wrapper(task: 'Tuple[Callable[..., object], Tuple[object, ...], Mapping[str, object]]',
+                          args: 'Tuple[int, object]', result: 'Tuple[int, object]', monkeypatch: 'MonkeyPatch') -> None:
+    monkeypatch.setattr(sys.modules['bpc_utils.multiprocessing'], '_task', task)
+    assert _mp_task_wrapper(args) == result
 
 
 @pytest.mark.parametrize(
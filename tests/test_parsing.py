@@ -2,6 +2,7 @@ import enum
 import io
 import re
 import socket
+import tokenize
 
 import pytest
 
@@ -84,6 +85,9 @@ def test_BPCSyntaxError() -> None:
         (b'*', 'utf-8'),
         (b'[1', 'utf-8'),
         (b'"""2', 'utf-8'),
+        (b'#!/usr/bin/env python\n# coding: latin-1\n\xe9', 'iso-8859-1'),
+        (b'\n\n# coding: gbk\n', 'utf-8'),
+        (b'', 'utf-8'),
     ]
 )
 def test_detect_encoding(code: bytes, result: str) -> None:
@@ -129,6 +133,26 @@ def test_detect_linesep(code_type: CodeType, code: str, result: 'Linesep') -> No
         raise ValueError('unknown code type')
 
 
+def test_detect_linesep_encoded_bytes() -> None:
+    assert detect_linesep(b'# coding: gbk\r\n\xd6\xd0\r\n\xce\xc4\n') == '\r\n'
+    assert detect_linesep('\u4e2d\r\u6587\r\n\r'.encode('utf-8-sig')) == '\r'
+
+
+@pytest.mark.parametrize(
+    'code,exc',
+    [
+        (b'# coding: foobar\n', SyntaxError),
+        (b'\xff\n', SyntaxError),
+        (b'x = 1\ny = 2\nz = "\xff"\n', UnicodeDecodeError),
+    ]
+)
+def test_detect_linesep_invalid_bytes(code: bytes, exc: 'Type[BaseException]') -> None:
+    with pytest.raises(exc):
+        detect_linesep(code)
+    with pytest.raises(exc):
+        detect_indentation(code)
+
+
 def test_detect_linesep_unseekable_file() -> None:
     with socket.socket() as s:
         s.connect(('httpbin.org', 80))
@@ -164,6 +188,21 @@ def test_detect_indentation(code_type: CodeType, code: str, result: str) -> None
         raise ValueError('unknown code type')
 
 
+@pytest.mark.parametrize(
+    'code,msg',
+    [
+        ('"""abc\n', 'EOF in multi-line string'),
+        ("x = '''abc\n", 'EOF in multi-line string'),
+        ('x = [1,\n2\n', 'EOF in multi-line statement'),
+        ('x = 1 + \\\n', 'EOF in multi-line statement'),
+        ('foo(1,\n2  # )\n', 'EOF in multi-line statement'),
+    ]
+)
+def test_detect_indentation_error(code: str, msg: str) -> None:
+    with pytest.raises(tokenize.TokenError, match=re.escape(msg)):
+        detect_indentation(code)
+
+
 def test_mixed_linesep_and_indentation() -> None:
     test_case = ('for x in [1]:\n    pass\rfor x in [1]:\r  pass', '\r', '  ')  # type: Tuple[str, Linesep, str]
     assert detect_linesep(test_case[0]) == test_case[1]